@@ -4,34 +4,83 @@ Main API server for toxicity detection, text rephrasing, and web scraping
 """
 
 from flask import Flask, request, jsonify
-from flask_cors import CORS
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.local import LocalProxy
+from functools import lru_cache
+import orjson
 import os
 from dotenv import load_dotenv
 
-from config import API_HOST, API_PORT, DEBUG, CORS_ORIGINS
+from config import API_HOST, API_PORT, DEBUG, CORS_ORIGINS, MAX_BATCH_SIZE
 from toxicity_analyzer import ToxicityAnalyzer
 from text_rephraser import TextRephraser
-from scraper import WebScraper
+from cache import RedisCache
 
 # Load environment variables
 load_dotenv()
 
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson for faster (de)serialization"""
+    
+    def dumps(self, obj, **kwargs) -> str:
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 # Initialize Flask app
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+
+# Configure CORS: origin checks are precomputed once instead of matching
+# resource patterns on every request. Entries ending in '*' are prefixes.
+_CORS_EXACT_ORIGINS = frozenset(o for o in CORS_ORIGINS if not o.endswith('*'))
+_CORS_ORIGIN_PREFIXES = tuple(o[:-1] for o in CORS_ORIGINS if o.endswith('*'))
+
+
+@app.after_request
+def add_cors_headers(response):
+    """Allow configured origins to call the API"""
+    origin = request.headers.get('Origin')
+    
+    if origin and request.path.startswith('/api/') and (
+        origin in _CORS_EXACT_ORIGINS or origin.startswith(_CORS_ORIGIN_PREFIXES)
+    ):
+        response.headers['Access-Control-Allow-Origin'] = origin
+        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+        response.vary.add('Origin')
+    
+    return response
 
-# Configure CORS
-CORS(app, resources={
-    r"/api/*": {
-        "origins": CORS_ORIGINS,
-        "methods": ["GET", "POST", "OPTIONS"],
-        "allow_headers": ["Content-Type"]
-    }
-})
 
 # Initialize modules
 toxicity_analyzer = ToxicityAnalyzer()
 text_rephraser = TextRephraser()
-web_scraper = WebScraper()
+
+
+@lru_cache(maxsize=None)
+def _get_web_scraper():
+    """Create the scraper on first use so its parsing stack only loads when needed"""
+    from scraper import WebScraper
+    return WebScraper()
+
+
+web_scraper = LocalProxy(_get_web_scraper)
+
+# Chat apps resend identical messages often, so share toxicity results
+# across workers through Redis (when REDIS_URL is set). ToxicityAnalyzer
+# already memoizes in-process. Bump the namespace version whenever detection
+# rules change.
+toxicity_cache = RedisCache(namespace='toxicity:v3')
 
 
 @app.route('/')
@@ -73,7 +122,15 @@ def check_toxicity():
             }), 400
         
         text = data['text']
-        result = toxicity_analyzer.analyze(text)
+        
+        # Only strings have a cache key; anything else goes straight to the analyzer
+        cacheable = isinstance(text, str)
+        result = toxicity_cache.get(text) if cacheable else None
+        
+        if result is None:
+            result = toxicity_analyzer.analyze(text)
+            if cacheable:
+                toxicity_cache.set(text, result)
         
         return jsonify(result)
         
@@ -295,6 +352,11 @@ def batch_analyze():
                 'error': 'texts must be an array'
             }), 400
         
+        if len(texts) > MAX_BATCH_SIZE:
+            return jsonify({
+                'error': f'texts must contain at most {MAX_BATCH_SIZE} items'
+            }), 413
+        
         results = toxicity_analyzer.batch_analyze(texts)
         
         return jsonify({
@@ -0,0 +1,98 @@
+"""
+SafeSpeakAI Backend - Cache Module
+Result cache shared across workers through an optional Redis server
+"""
+
+import hashlib
+import json
+import time
+from typing import Dict, Optional
+
+from config import CACHE_TTL, REDIS_URL, REDIS_TIMEOUT, REDIS_RETRY_AFTER
+
+
+class RedisCache:
+    """Result cache stored in Redis; a no-op when Redis is not configured"""
+    
+    def __init__(self, namespace: str, redis_url: Optional[str] = REDIS_URL,
+                 ttl: int = CACHE_TTL):
+        self.namespace = namespace
+        self.ttl = ttl
+        self._redis = self._connect_redis(redis_url) if redis_url else None
+        # After a failed call Redis is skipped until this monotonic time, so an
+        # unreachable server doesn't stall every request on a connect timeout
+        self._retry_at = 0.0
+    
+    def _connect_redis(self, redis_url: str):
+        """Create a Redis client, or return None if Redis is unavailable"""
+        try:
+            import redis
+            return redis.Redis.from_url(
+                redis_url,
+                socket_connect_timeout=REDIS_TIMEOUT,
+                socket_timeout=REDIS_TIMEOUT
+            )
+        except Exception as e:
+            print(f"Redis cache disabled: {e}")
+            return None
+    
+    def _available(self) -> bool:
+        """Whether Redis is configured and not backing off after a failure"""
+        return self._redis is not None and time.monotonic() >= self._retry_at
+    
+    def _mark_failed(self):
+        """Skip Redis for REDIS_RETRY_AFTER seconds"""
+        self._retry_at = time.monotonic() + REDIS_RETRY_AFTER
+    
+    def _make_key(self, text: str) -> str:
+        """
+        Build a fixed-size cache key for a text
+        
+        Args:
+            text: The text results are cached for
+            
+        Returns:
+            Namespaced hash of the text
+        """
+        digest = hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+        return f"{self.namespace}:{digest}"
+    
+    def get(self, text: str) -> Optional[Dict]:
+        """
+        Look up a cached result
+        
+        Args:
+            text: The text the result was computed for
+            
+        Returns:
+            Cached result, or None on a miss
+        """
+        if not self._available():
+            return None
+        
+        try:
+            cached = self._redis.get(self._make_key(text))
+        except Exception:
+            self._mark_failed()
+            return None
+        
+        if cached is None:
+            return None
+        
+        return json.loads(cached)
+    
+    def set(self, text: str, value: Dict):
+        """
+        Cache a result
+        
+        Args:
+            text: The text the result was computed for
+            value: JSON-serializable result
+        """
+        if not self._available():
+            return
+        
+        try:
+            self._redis.set(self._make_key(text), json.dumps(value), ex=self.ttl)
+        except Exception:
+            self._mark_failed()
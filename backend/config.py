@@ -14,7 +14,22 @@ CORS_ORIGINS = [
 USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
 REQUEST_TIMEOUT = 10
 MAX_RETRIES = 3
+SCRAPE_MAX_WORKERS = 16  # concurrent hosts in scrape_multiple
+SCRAPE_DELAY = 1         # seconds between requests to the same host
+MAX_CONTENT_BYTES = 2 * 1024 * 1024  # larger pages are rejected before parsing
+SCRAPE_CACHE_BYTES = 8 * 1024 * 1024  # total page bytes kept per scraper for conditional requests
 
 # Toxicity Detection Settings
 TOXICITY_THRESHOLD = 0.7
 CONFIDENCE_THRESHOLD = 0.6
+MAX_BATCH_SIZE = 1000  # texts accepted per /api/batch-analyze request
+ANALYZE_CACHE_SIZE = 4096  # recent texts whose analysis results are memoized
+ANALYZE_CACHE_MAX_LENGTH = 1000  # longer texts are analyzed without caching
+PERSPECTIVE_MAX_CONNECTIONS = 32  # pooled keep-alive connections to Perspective API
+PERSPECTIVE_QPS = 1  # requests per second allowed by the Perspective API quota
+
+# Result Cache Settings
+CACHE_TTL = 86400       # seconds entries live in Redis
+REDIS_URL = None        # e.g. 'redis://localhost:6379/0' (requires the redis package)
+REDIS_TIMEOUT = 0.2     # seconds to wait on a Redis connect or command
+REDIS_RETRY_AFTER = 30  # seconds to skip Redis after a failed call
@@ -0,0 +1,18 @@
+"""
+SafeSpeakAI Backend - Gunicorn Configuration
+Production server settings, used via: gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+import multiprocessing
+
+from config import API_HOST, API_PORT
+
+bind = f'{API_HOST}:{API_PORT}'
+
+# Scraping and external API calls are I/O-bound, so each worker serves many
+# in-flight requests cooperatively; the gevent worker monkey-patches sockets
+# so requests' blocking calls yield instead of stalling the worker
+workers = multiprocessing.cpu_count() * 2 + 1
+worker_class = 'gevent'
+worker_connections = 1000
+timeout = 30
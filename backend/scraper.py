@@ -4,10 +4,83 @@ Provides web scraping capabilities using BeautifulSoup and Selenium
 """
 
 import requests
-from bs4 import BeautifulSoup
-from typing import Dict, List, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree, html as lxml_html
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+import threading
 import time
-from config import USER_AGENT, REQUEST_TIMEOUT, MAX_RETRIES
+from config import (
+    USER_AGENT, REQUEST_TIMEOUT, MAX_RETRIES, SCRAPE_MAX_WORKERS, SCRAPE_DELAY,
+    MAX_CONTENT_BYTES, SCRAPE_CACHE_BYTES
+)
+
+# Text nodes of a table cell, excluding script and style contents
+_CELL_TEXT_XPATH = './/text()[not(ancestor::script or ancestor::style)]'
+
+
+def _header_charset(content_type: str) -> Optional[str]:
+    """
+    Extract the charset parameter from a Content-Type header
+    
+    Args:
+        content_type: Raw Content-Type header value
+        
+    Returns:
+        Declared charset, or None so parsers fall back to sniffing the body
+    """
+    for param in content_type.split(';')[1:]:
+        name, _, value = param.partition('=')
+        if name.strip().lower() == 'charset':
+            return value.strip().strip('"\'') or None
+    return None
+
+
+def _html_parser(encoding: Optional[str], content: bytes) -> Optional[lxml_html.HTMLParser]:
+    """
+    Build an lxml HTML parser that decodes a page like BeautifulSoup would
+    
+    Args:
+        encoding: Charset from the Content-Type header, if any
+        content: Raw page body
+        
+    Returns:
+        Parser for the declared charset if lxml knows it; otherwise a UTF-8
+        parser when the body is valid UTF-8, or None to let lxml sniff
+        <meta charset> (libxml2 would otherwise assume Latin-1)
+    """
+    if encoding:
+        try:
+            return lxml_html.HTMLParser(encoding=encoding)
+        except LookupError:
+            pass
+    
+    try:
+        content.decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+    return lxml_html.HTMLParser(encoding='utf-8')
+
+
+def _host_of(url) -> str:
+    """
+    Get the host a URL is grouped under in scrape_multiple
+    
+    Args:
+        url: Entry from the caller's URL list, which may not be a valid URL
+        
+    Returns:
+        Network location of the URL, or '' for malformed entries so
+        scrape_url still reports them with its per-URL error result
+    """
+    try:
+        return urlparse(str(url)).netloc
+    except ValueError:
+        return ''
 
 
 class WebScraper:
@@ -18,6 +91,122 @@ class WebScraper:
         self.session.headers.update({
             'User-Agent': USER_AGENT
         })
+        
+        # Keep connections alive across calls and retry transient upstream errors
+        adapter = HTTPAdapter(
+            pool_connections=SCRAPE_MAX_WORKERS,
+            pool_maxsize=SCRAPE_MAX_WORKERS,
+            max_retries=Retry(
+                total=MAX_RETRIES,
+                backoff_factor=0.2,
+                status_forcelist=[502, 503, 504],
+                raise_on_status=False
+            )
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # url -> (etag, last_modified, status_code, body, encoding) for conditional
+        # requests, bounded by the total size of the stored bodies
+        self._page_cache = OrderedDict()
+        self._page_cache_bytes = 0
+        self._page_cache_lock = threading.Lock()
+    
+    def _fetch(self, url: str) -> Tuple[int, bytes, Optional[str]]:
+        """
+        Download a page body, streaming it so oversized pages are never fully read
+        
+        Pages served with an ETag or Last-Modified header are remembered and
+        revalidated on the next fetch, so unchanged pages come back as an
+        empty 304 response instead of a full download.
+        
+        Args:
+            url: The URL to fetch
+            
+        Returns:
+            Tuple of (status code, body bytes, charset from the Content-Type
+            header or None if the header does not declare one)
+            
+        Raises:
+            requests.RequestException: On HTTP errors, non-text content types,
+                or bodies larger than MAX_CONTENT_BYTES
+        """
+        with self._page_cache_lock:
+            cached = self._page_cache.get(url)
+        
+        headers = {}
+        if cached:
+            etag, last_modified = cached[0], cached[1]
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        
+        with self.session.get(url, timeout=REQUEST_TIMEOUT, stream=True, headers=headers) as response:
+            if cached and response.status_code == 304:
+                with self._page_cache_lock:
+                    if url in self._page_cache:
+                        self._page_cache.move_to_end(url)
+                return cached[2], cached[3], cached[4]
+            
+            response.raise_for_status()
+            
+            content_type = response.headers.get('Content-Type', '')
+            mime_type = content_type.split(';')[0].strip().lower()
+            if mime_type and not (mime_type.startswith('text/') or mime_type.endswith('xml')):
+                raise requests.RequestException(
+                    f"Unsupported content type: {content_type}", response=response
+                )
+            
+            too_large = requests.RequestException(
+                f"Response body exceeds {MAX_CONTENT_BYTES} bytes", response=response
+            )
+            content_length = response.headers.get('Content-Length', '')
+            if content_length.isdigit() and int(content_length) > MAX_CONTENT_BYTES:
+                raise too_large
+            
+            body = bytearray()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                body += chunk
+                if len(body) > MAX_CONTENT_BYTES:
+                    raise too_large
+            
+            body = bytes(body)
+            encoding = _header_charset(content_type)
+            self._remember_page(url, response, body, encoding)
+            
+            return response.status_code, body, encoding
+    
+    def _remember_page(self, url: str, response: requests.Response, body: bytes,
+                       encoding: Optional[str]):
+        """
+        Keep a page for later conditional requests if the server sent validators
+        
+        Args:
+            url: The requested URL
+            response: The response the body was read from
+            body: The downloaded body
+            encoding: Charset declared in the Content-Type header, if any
+        """
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        
+        # A single page may take at most a quarter of the budget, so one large
+        # page cannot flush everything else
+        if (not etag and not last_modified) or len(body) > SCRAPE_CACHE_BYTES // 4:
+            return
+        
+        with self._page_cache_lock:
+            previous = self._page_cache.pop(url, None)
+            if previous is not None:
+                self._page_cache_bytes -= len(previous[3])
+            
+            self._page_cache[url] = (etag, last_modified, response.status_code, body, encoding)
+            self._page_cache_bytes += len(body)
+            
+            while self._page_cache_bytes > SCRAPE_CACHE_BYTES:
+                _, evicted = self._page_cache.popitem(last=False)
+                self._page_cache_bytes -= len(evicted[3])
     
     def scrape_url(self, url: str, selector: Optional[str] = None) -> Dict:
         """
@@ -31,10 +220,9 @@ class WebScraper:
             Dictionary with scraped data
         """
         try:
-            response = self.session.get(url, timeout=REQUEST_TIMEOUT)
-            response.raise_for_status()
+            status_code, content, encoding = self._fetch(url)
             
-            soup = BeautifulSoup(response.content, 'lxml')
+            soup = BeautifulSoup(content, 'lxml', from_encoding=encoding)
             
             if selector:
                 elements = soup.select(selector)
@@ -46,7 +234,7 @@ class WebScraper:
                 'success': True,
                 'url': url,
                 'content': content,
-                'status_code': response.status_code
+                'status_code': status_code
             }
             
         except requests.RequestException as e:
@@ -66,14 +254,35 @@ class WebScraper:
         Returns:
             List of scraping results
         """
-        results = []
-        for url in urls:
-            result = self.scrape_url(url)
-            results.append(result)
-            time.sleep(1)  # Rate limiting
+        # Group URLs by host: each host is still fetched one URL at a time with
+        # a polite delay, while different hosts are scraped concurrently
+        by_host = {}
+        for index, url in enumerate(urls):
+            by_host.setdefault(_host_of(url), []).append((index, url))
+        
+        results = [None] * len(urls)
+        if not by_host:
+            return results
+        
+        workers = min(SCRAPE_MAX_WORKERS, len(by_host))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(lambda jobs: self._scrape_host(jobs, results), by_host.values()))
         
         return results
     
+    def _scrape_host(self, jobs: List[Tuple[int, str]], results: List[Optional[Dict]]):
+        """
+        Scrape URLs from a single host sequentially
+        
+        Args:
+            jobs: (index, url) pairs for one host
+            results: Shared result list, filled in at each job's index
+        """
+        for position, (index, url) in enumerate(jobs):
+            if position:
+                time.sleep(SCRAPE_DELAY)  # Rate limiting
+            results[index] = self.scrape_url(url)
+    
     def extract_links(self, url: str) -> List[str]:
         """
         Extract all links from a webpage
@@ -85,10 +294,12 @@ class WebScraper:
             List of URLs found on the page
         """
         try:
-            response = self.session.get(url, timeout=REQUEST_TIMEOUT)
-            response.raise_for_status()
+            _, content, encoding = self._fetch(url)
             
-            soup = BeautifulSoup(response.content, 'lxml')
+            # Only build <a href> tags instead of the whole document tree
+            soup = BeautifulSoup(
+                content, 'lxml', parse_only=SoupStrainer('a', href=True), from_encoding=encoding
+            )
             links = []
             
             for link in soup.find_all('a', href=True):
@@ -113,11 +324,12 @@ class WebScraper:
             List of rows, where each row is a list of cell values
         """
         try:
-            response = self.session.get(url, timeout=REQUEST_TIMEOUT)
-            response.raise_for_status()
+            _, content, encoding = self._fetch(url)
             
-            soup = BeautifulSoup(response.content, 'lxml')
-            tables = soup.find_all('table')
+            # Walk the lxml tree directly with XPath; tables can be large and
+            # building a BeautifulSoup object per cell dominates the cost
+            document = lxml_html.fromstring(content, parser=_html_parser(encoding, content))
+            tables = document.xpath('//table')
             
             if table_index >= len(tables):
                 return []
@@ -125,14 +337,19 @@ class WebScraper:
             table = tables[table_index]
             rows = []
             
-            for tr in table.find_all('tr'):
-                cells = [td.get_text(strip=True) for td in tr.find_all(['td', 'th'])]
+            for tr in table.xpath('.//tr'):
+                # Join stripped text nodes outside <script>/<style>, matching
+                # BeautifulSoup's get_text(strip=True)
+                cells = [
+                    ''.join(text.strip() for text in cell.xpath(_CELL_TEXT_XPATH))
+                    for cell in tr.xpath('.//td | .//th')
+                ]
                 if cells:
                     rows.append(cells)
             
             return rows
             
-        except (requests.RequestException, IndexError):
+        except (requests.RequestException, etree.ParserError, IndexError):
             return []
 
 
@@ -161,13 +378,17 @@ class DynamicScraper:
             print(f"Failed to setup Selenium driver: {e}")
             return False
     
-    def scrape_dynamic(self, url: str, wait_time: int = 3) -> Dict:
+    def scrape_dynamic(self, url: str, wait_time: int = 3,
+                       wait_selector: Optional[str] = None) -> Dict:
         """
         Scrape dynamically loaded content
         
         Args:
             url: The URL to scrape
-            wait_time: Time to wait for content to load (seconds)
+            wait_time: Time to wait for content to load (seconds). With
+                wait_selector this is the upper bound on the wait.
+            wait_selector: Optional CSS selector for the content being waited
+                on; scraping starts as soon as a matching element appears
             
         Returns:
             Dictionary with scraped data
@@ -177,15 +398,35 @@ class DynamicScraper:
         
         try:
             self.driver.get(url)
-            time.sleep(wait_time)
             
-            content = self.driver.page_source
-            soup = BeautifulSoup(content, 'lxml')
+            if wait_selector:
+                from selenium.common.exceptions import TimeoutException
+                from selenium.webdriver.common.by import By
+                from selenium.webdriver.support import expected_conditions as EC
+                from selenium.webdriver.support.ui import WebDriverWait
+                
+                # Stop waiting as soon as the awaited content is rendered
+                try:
+                    WebDriverWait(self.driver, wait_time).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, wait_selector))
+                    )
+                except TimeoutException:
+                    return {
+                        'success': False,
+                        'url': url,
+                        'error': f"Timed out after {wait_time}s waiting for '{wait_selector}'"
+                    }
+            else:
+                # No readiness signal to wait on; give scripts time to render
+                time.sleep(wait_time)
+            
+            # Let the browser extract the rendered text instead of re-parsing page_source
+            content = self.driver.execute_script('return document.body ? document.body.innerText : ""')
             
             return {
                 'success': True,
                 'url': url,
-                'content': soup.get_text(strip=True)
+                'content': content.strip()
             }
             
         except Exception as e:
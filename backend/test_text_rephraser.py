@@ -0,0 +1,27 @@
+"""
+SafeSpeakAI Backend - Text Rephraser regression checks
+Run from the backend directory: python -m unittest test_text_rephraser
+"""
+
+import unittest
+
+from text_rephraser import TextRephraser
+
+
+class OverlappingPhraseTest(unittest.TestCase):
+    """Phrase rules that share words do not break each other's output"""
+    
+    def setUp(self):
+        self.rephraser = TextRephraser()
+    
+    def test_i_hate_you_followed_by_insult(self):
+        result = self.rephraser.rephrase("I hate you're stupid")
+        self.assertEqual(result['rephrased'], "I strongly dislike I see things differently")
+    
+    def test_i_hate_you_alone(self):
+        result = self.rephraser.rephrase("I hate you")
+        self.assertEqual(result['rephrased'], "I'm frustrated with this situation")
+
+
+if __name__ == '__main__':
+    unittest.main()
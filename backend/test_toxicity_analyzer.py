@@ -0,0 +1,64 @@
+"""
+SafeSpeakAI Backend - Toxicity Analyzer regression checks
+Run from the backend directory: python -m unittest test_toxicity_analyzer
+"""
+
+import unittest
+
+from toxicity_analyzer import ToxicityAnalyzer
+
+
+class KeywordBoundaryTest(unittest.TestCase):
+    """Keywords only match as whole words"""
+    
+    def setUp(self):
+        self.analyzer = ToxicityAnalyzer()
+    
+    def test_keyword_inside_other_word_is_ignored(self):
+        for text in ['hello there!!', 'hellooo', 'this is the shell', 'dumbbell workout']:
+            result = self.analyzer.analyze(text)
+            self.assertFalse(result['isToxic'], text)
+            self.assertEqual(result['keywords'], [], text)
+    
+    def test_elongated_keyword_still_matches(self):
+        result = self.analyzer.analyze('stupidddd')
+        self.assertTrue(result['isToxic'])
+        self.assertEqual(result['keywords'], ['stupid'])
+    
+    def test_inflected_keyword_still_matches(self):
+        cases = {
+            'you idiots': 'idiot',
+            "you're all losers": 'loser',
+            'stop being such freaks': 'freak',
+            'creeps': 'creep',
+            'that was pure stupidity': 'stupid',
+            'I hated it': 'hate',
+        }
+        for text, keyword in cases.items():
+            result = self.analyzer.analyze(text)
+            self.assertTrue(result['isToxic'], text)
+            self.assertEqual(result['keywords'], [keyword], text)
+
+
+
+class ResultIsolationTest(unittest.TestCase):
+    """Modifying a returned result never leaks into later results"""
+    
+    def setUp(self):
+        self.analyzer = ToxicityAnalyzer()
+    
+    def test_uncached_results_are_independent(self):
+        self.analyzer.analyze(None)['keywords'].append('X')
+        self.analyzer.analyze('a' * 2000)['suggestions'].append('Y')
+        for text in [None, 'a' * 2000, 'hi']:
+            result = self.analyzer.analyze(text)
+            self.assertEqual(result['keywords'], [], text)
+            self.assertEqual(result['suggestions'], [], text)
+    
+    def test_cached_results_are_independent(self):
+        self.analyzer.analyze('you idiot')['keywords'].append('X')
+        self.assertEqual(self.analyzer.analyze('you idiot')['keywords'], ['idiot'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,34 @@ AI-powered and rule-based text rephrasing for polite communication
 import re
 from typing import Dict, List, Optional
 
+# Patterns used by general softening, compiled once at import
+_RE_EXCLAIM = re.compile(r'!{2,}')
+_RE_LEADING = re.compile(r'^(you|this|that)\b', re.IGNORECASE)
+
+
+def _leading_guard(rules: List[Dict]) -> str:
+    """
+    Build a lookahead prefix for the combined rule pattern
+    
+    When every rule starts with a word boundary followed by a literal letter,
+    prefixing the alternation with those letters lets the regex engine skip
+    positions that cannot start any rule instead of trying every branch.
+    
+    Args:
+        rules: Phrase rules with regex 'pattern' strings
+        
+    Returns:
+        Regex prefix, or an empty string if the rules have no common shape
+    """
+    first_chars = set()
+    for rule in rules:
+        pattern = rule['pattern']
+        if not pattern.startswith(r'\b') or not pattern[2:3].isalpha():
+            return ''
+        first_chars.add(pattern[2].lower())
+    
+    return r'\b(?=[' + ''.join(sorted(first_chars)) + '])'
+
 
 class TextRephraser:
     """Intelligent text rephrasing for converting toxic to polite language"""
@@ -30,27 +58,18 @@ class TextRephraser:
                 'flags': re.IGNORECASE
             },
             {
-                'pattern': r"\byou'?re an? idiot\b",
-                'replacement': "I think there might be a misunderstanding",
-                'flags': re.IGNORECASE
-            },
-            {
-                'pattern': r'\byou are an? idiot\b',
+                'pattern': r"\byou(?: are|'?re) an? idiot\b",
                 'replacement': "I think there might be a misunderstanding",
                 'flags': re.IGNORECASE
             },
             {
-                'pattern': r'\bi hate you\b',
+                # Leave "you" for a following "you're ..."/"you are ..." rule
+                'pattern': r"\bi hate you\b(?!'?re\b|\s+are\b)",
                 'replacement': "I'm frustrated with this situation",
                 'flags': re.IGNORECASE
             },
             {
-                'pattern': r"\byou'?re dumb\b",
-                'replacement': "I believe there's a better way to think about this",
-                'flags': re.IGNORECASE
-            },
-            {
-                'pattern': r'\byou are dumb\b',
+                'pattern': r"\byou(?: are|'?re) dumb\b",
                 'replacement': "I believe there's a better way to think about this",
                 'flags': re.IGNORECASE
             },
@@ -116,6 +135,21 @@ class TextRephraser:
                 'flags': re.IGNORECASE
             }
         ]
+        
+        # Compile all rules into one alternation so rephrasing is a single
+        # pass over the text instead of one search/sub per rule. Longer
+        # patterns go first so a phrase wins over a single word it contains.
+        ordered_rules = sorted(self.phrase_rules, key=lambda rule: -len(rule['pattern']))
+        alternation = '|'.join(
+            f"(?P<r{i}>{rule['pattern']})" for i, rule in enumerate(ordered_rules)
+        )
+        self._rules_pattern = re.compile(
+            _leading_guard(self.phrase_rules) + f'(?:{alternation})',
+            re.IGNORECASE
+        )
+        self._rule_replacements = {
+            f'r{i}': rule['replacement'] for i, rule in enumerate(ordered_rules)
+        }
     
     def rephrase(self, text: str, keywords: Optional[List[str]] = None) -> Dict:
         """
@@ -136,18 +170,9 @@ class TextRephraser:
                 'confidence': 0.0
             }
         
-        rephrased = text
-        modified = False
-        
         # Apply phrase-based rules first (more specific)
-        for rule in self.phrase_rules:
-            pattern = rule['pattern']
-            replacement = rule['replacement']
-            flags = rule.get('flags', 0)
-            
-            if re.search(pattern, rephrased, flags):
-                rephrased = re.sub(pattern, replacement, rephrased, flags=flags)
-                modified = True
+        rephrased, matches = self._rules_pattern.subn(self._replace_rule, text)
+        modified = matches > 0
         
         # If no specific rule matched, apply general softening
         if not modified and keywords:
@@ -165,6 +190,10 @@ class TextRephraser:
             'keywords': keywords or []
         }
     
+    def _replace_rule(self, match: re.Match) -> str:
+        """Return the replacement for whichever rule produced the match"""
+        return self._rule_replacements[match.lastgroup]
+    
     def _general_softening(self, text: str) -> str:
         """
         Apply general text softening techniques
@@ -178,14 +207,14 @@ class TextRephraser:
         softened = text
         
         # Remove excessive exclamation marks
-        softened = re.sub(r'!{2,}', '.', softened)
+        softened = _RE_EXCLAIM.sub('.', softened)
         
         # Convert ALL CAPS to normal case (if long enough)
         if len(softened) > 10 and softened.isupper():
             softened = softened.capitalize()
         
         # Add softening prefix for strong statements
-        if re.match(r'^(you|this|that)\b', softened, re.IGNORECASE):
+        if _RE_LEADING.match(softened):
             softened = "Perhaps " + softened[0].lower() + softened[1:]
         
         return softened
@@ -206,9 +235,10 @@ class TextRephraser:
         
         # Simple confidence based on text difference
         original_words = set(original.lower().split())
-        rephrased_words = set(rephrased.lower().split())
+        # difference() takes any iterable, so the rephrased words need no set of their own
+        changed_words = original_words.difference(rephrased.lower().split())
         
-        changed_ratio = len(original_words - rephrased_words) / max(len(original_words), 1)
+        changed_ratio = len(changed_words) / max(len(original_words), 1)
         
         return min(changed_ratio * 2, 1.0)
     
@@ -244,7 +274,19 @@ class TextRephraser:
         Returns:
             List of rephrasing results
         """
-        return [self.rephrase(text) for text in texts]
+        # Chat batches repeat messages often, so handle each distinct text once.
+        # Only strings are deduplicated; other items may not be hashable.
+        seen = {}
+        results = []
+        for text in texts:
+            if not isinstance(text, str):
+                results.append(self.rephrase(text))
+                continue
+            if text not in seen:
+                seen[text] = self.rephrase(text)
+            results.append(seen[text])
+        
+        return results
 
 
 # Optional: OpenAI-based rephraser
@@ -253,6 +295,7 @@ class AIRephraser:
     
     def __init__(self, api_key: str):
         self.api_key = api_key
+        self._openai = None
     
     def rephrase(self, text: str) -> Dict:
         """
@@ -265,8 +308,9 @@ class AIRephraser:
             Rephrasing result
         """
         try:
-            import openai
-            openai.api_key = self.api_key
+            if self._openai is None:
+                import openai
+                self._openai = openai
             
             prompt = f"""Rephrase the following text to be more polite and constructive while maintaining the core message:
 
@@ -274,7 +318,10 @@ Original: {text}
 
 Rephrased:"""
             
-            response = openai.ChatCompletion.create(
+            # Pass the key per request: openai.api_key is module-global and
+            # would be shared by every AIRephraser instance
+            response = self._openai.ChatCompletion.create(
+                api_key=self.api_key,
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant that rephrases toxic or aggressive text into polite, constructive communication."},
@@ -4,13 +4,67 @@ Advanced toxicity detection with ML-based analysis
 """
 
 import re
-from typing import Dict, List
-from config import TOXICITY_THRESHOLD, CONFIDENCE_THRESHOLD
+import threading
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from functools import lru_cache
+from typing import Collection, Dict, List
+from config import (
+    TOXICITY_THRESHOLD, CONFIDENCE_THRESHOLD, ANALYZE_CACHE_SIZE,
+    ANALYZE_CACHE_MAX_LENGTH, PERSPECTIVE_MAX_CONNECTIONS, PERSPECTIVE_QPS
+)
+
+# Patterns used by context analysis, compiled once at import
+_RE_REPEATED = re.compile(r'(.)\1{2,}')
+
+
+# Inflections a keyword may carry and still count as the same word
+_KEYWORD_SUFFIX = '(?:s|es|d|ed|ity)?'
+
+
+def _keyword_pattern(keyword: str) -> re.Pattern:
+    """
+    Compile a whole-word pattern for a keyword
+    
+    Args:
+        keyword: Lowercase keyword or phrase
+        
+    Returns:
+        Pattern matching the keyword as a word, allowing its last letter to
+        be repeated (e.g. "stupidddd") and a common inflection suffix
+        (e.g. "idiots", "hated", "stupidity")
+    """
+    return re.compile(
+        r'\b' + re.escape(keyword) + '(?:' + re.escape(keyword[-1]) + r')*'
+        + _KEYWORD_SUFFIX + r'\b'
+    )
 
 
 class ToxicityAnalyzer:
     """Advanced toxicity detection and analysis"""
     
+    # Result for text with no toxic keywords. Its lists are shared between
+    # results, so analyze() must copy them before handing a result out.
+    _NOT_TOXIC_RESULT = {
+        'isToxic': False,
+        'confidence': 0.0,
+        'severity': 0.0,
+        'keywords': [],
+        'categories': [],
+        'suggestions': []
+    }
+    
+    # Suggestion shown for each category, in display order
+    _SUGGESTIONS = {
+        'hate_speech': "Consider expressing disagreement without using hateful language",
+        'insults': "Try focusing on the issue rather than personal attacks",
+        'aggressive': "A calmer tone might lead to better communication",
+        'derogatory': "Respectful language helps maintain positive relationships"
+    }
+    
     def __init__(self):
         # Enhanced toxic keywords with categories
         self.toxic_patterns = {
@@ -46,11 +100,49 @@ class ToxicityAnalyzer:
             'all_caps': 1.3,        # e.g., "YOU ARE STUPID"
             'multiple_exclamation': 1.2  # e.g., "stupid!!!"
         }
+        
+        # Flatten the category table once into (keyword, category, severity,
+        # pattern) rows so analyze() walks one tuple with no dict lookups.
+        # Keywords must be whole words ("hell" should not match "shell" or
+        # "hello"), but the last letter may repeat so "stupidddd" still matches,
+        # and plurals and other common inflections ("losers", "hated") count.
+        self._keyword_table = tuple(
+            (keyword, category, data['severity'], _keyword_pattern(keyword))
+            for category, data in self.toxic_patterns.items()
+            for keyword in data['keywords']
+        )
+        
+        # Chat and comment streams repeat messages often, so memoize results
+        self._cached_analyze = lru_cache(maxsize=ANALYZE_CACHE_SIZE)(self._analyze)
     
     def analyze(self, text: str) -> Dict:
         """
         Analyze text for toxic content
         
+        Args:
+            text: The text to analyze
+            
+        Returns:
+            Dictionary with toxicity analysis results
+        """
+        # Only short strings are memoized: repeats are almost always short chat
+        # messages, and this keeps cache keys small and hashable
+        if not isinstance(text, str) or len(text) > ANALYZE_CACHE_MAX_LENGTH:
+            result = self._analyze(text)
+        else:
+            result = self._cached_analyze(text)
+        
+        # Cached results and the not-toxic template are shared, so hand out
+        # copies callers can modify
+        return {
+            key: list(value) if isinstance(value, list) else value
+            for key, value in result.items()
+        }
+    
+    def _analyze(self, text: str) -> Dict:
+        """
+        Analyze text for toxic content without caching
+        
         Args:
             text: The text to analyze
             
@@ -58,40 +150,39 @@ class ToxicityAnalyzer:
             Dictionary with toxicity analysis results
         """
         if not text or not text.strip():
-            return {
-                'isToxic': False,
-                'confidence': 0.0,
-                'severity': 0.0,
-                'keywords': [],
-                'categories': [],
-                'suggestions': []
-            }
+            return dict(self._NOT_TOXIC_RESULT)
         
         text_lower = text.lower()
-        found_keywords = []
-        categories = []
+        # Dicts deduplicate while keeping detection order
+        found_keywords = {}
+        categories = {}
         max_severity = 0.0
         
-        # Check for toxic patterns
-        for category, data in self.toxic_patterns.items():
-            for keyword in data['keywords']:
-                if keyword in text_lower:
-                    found_keywords.append(keyword)
-                    categories.append(category)
-                    max_severity = max(max_severity, data['severity'])
+        # Check for toxic patterns. The substring test is a fast C-level
+        # prefilter; the boundary regex only runs for keywords that occur.
+        for keyword, category, severity, pattern in self._keyword_table:
+            if keyword in text_lower and pattern.search(text_lower):
+                found_keywords[keyword] = None
+                categories[category] = None
+                if severity > max_severity:
+                    max_severity = severity
+        
+        # Most messages contain no keywords; skip context analysis for them
+        if not found_keywords:
+            return {**self._NOT_TOXIC_RESULT, 'originalText': text}
         
         # Apply context multipliers
         context_score = self._analyze_context(text)
         adjusted_severity = min(max_severity * context_score, 1.0)
         
-        is_toxic = len(found_keywords) > 0 and adjusted_severity >= CONFIDENCE_THRESHOLD
+        is_toxic = adjusted_severity >= CONFIDENCE_THRESHOLD
         
         return {
             'isToxic': is_toxic,
             'confidence': adjusted_severity,
             'severity': adjusted_severity,
-            'keywords': list(set(found_keywords)),
-            'categories': list(set(categories)),
+            'keywords': list(found_keywords),
+            'categories': list(categories),
             'suggestions': self._generate_suggestions(categories) if is_toxic else [],
             'originalText': text
         }
@@ -109,44 +200,34 @@ class ToxicityAnalyzer:
         multiplier = 1.0
         
         # Check for repeated characters
-        if re.search(r'(.)\1{2,}', text):
+        if _RE_REPEATED.search(text):
             multiplier *= self.context_multipliers['repeated_chars']
         
         # Check for all caps (excluding short text)
         if len(text) > 10 and text.isupper():
             multiplier *= self.context_multipliers['all_caps']
         
-        # Check for multiple exclamation marks
-        if text.count('!') >= 2:
+        # Check for multiple exclamation marks, stopping at the second one
+        first_exclamation = text.find('!')
+        if first_exclamation != -1 and text.find('!', first_exclamation + 1) != -1:
             multiplier *= self.context_multipliers['multiple_exclamation']
         
         return multiplier
     
-    def _generate_suggestions(self, categories: List[str]) -> List[str]:
+    def _generate_suggestions(self, categories: Collection[str]) -> List[str]:
         """
         Generate suggestions based on detected categories
         
         Args:
-            categories: List of detected toxicity categories
+            categories: Detected toxicity categories
             
         Returns:
             List of suggestion strings
         """
-        suggestions = []
-        
-        if 'hate_speech' in categories:
-            suggestions.append("Consider expressing disagreement without using hateful language")
-        
-        if 'insults' in categories:
-            suggestions.append("Try focusing on the issue rather than personal attacks")
-        
-        if 'aggressive' in categories:
-            suggestions.append("A calmer tone might lead to better communication")
-        
-        if 'derogatory' in categories:
-            suggestions.append("Respectful language helps maintain positive relationships")
-        
-        return suggestions
+        return [
+            suggestion for category, suggestion in self._SUGGESTIONS.items()
+            if category in categories
+        ]
     
     def batch_analyze(self, texts: List[str]) -> List[Dict]:
         """
@@ -158,7 +239,19 @@ class ToxicityAnalyzer:
         Returns:
             List of analysis results
         """
-        return [self.analyze(text) for text in texts]
+        # Chat batches repeat messages often, so handle each distinct text once.
+        # Only strings are deduplicated; other items may not be hashable.
+        seen = {}
+        results = []
+        for text in texts:
+            if not isinstance(text, str):
+                results.append(self.analyze(text))
+                continue
+            if text not in seen:
+                seen[text] = self.analyze(text)
+            results.append(seen[text])
+        
+        return results
     
     def get_toxicity_score(self, text: str) -> float:
         """
@@ -181,6 +274,37 @@ class PerspectiveAPIAnalyzer:
     def __init__(self, api_key: str):
         self.api_key = api_key
         self.endpoint = 'https://commentanalyzer.googleapis.com/v1alpha1/comments:analyze'
+        
+        # Reuse keep-alive connections instead of a new TCP+TLS handshake per call.
+        # A 429 means the request was not processed, so it is safe to retry
+        # the POST after the server's Retry-After delay.
+        self._session = requests.Session()
+        self._session.mount('https://', HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=PERSPECTIVE_MAX_CONNECTIONS,
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.1,
+                status_forcelist=[429],
+                allowed_methods=frozenset({'POST'}),
+                raise_on_status=False
+            )
+        ))
+        
+        # Space out request start times to stay within the QPS quota
+        self._request_interval = 1.0 / PERSPECTIVE_QPS
+        self._next_request_at = 0.0
+        self._rate_lock = threading.Lock()
+    
+    def _wait_for_rate_limit(self):
+        """Block until another request may start under PERSPECTIVE_QPS"""
+        with self._rate_lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_request_at)
+            self._next_request_at = start_at + self._request_interval
+        
+        if start_at > now:
+            time.sleep(start_at - now)
     
     def analyze(self, text: str) -> Dict:
         """
@@ -192,8 +316,6 @@ class PerspectiveAPIAnalyzer:
         Returns:
             Analysis results
         """
-        import requests
-        
         try:
             payload = {
                 'comment': {'text': text},
@@ -206,7 +328,8 @@ class PerspectiveAPIAnalyzer:
                 }
             }
             
-            response = requests.post(
+            self._wait_for_rate_limit()
+            response = self._session.post(
                 f"{self.endpoint}?key={self.api_key}",
                 json=payload,
                 timeout=5
@@ -229,3 +352,22 @@ class PerspectiveAPIAnalyzer:
                 
         except Exception as e:
             return {'error': str(e)}
+    
+    def analyze_many(self, texts: List[str]) -> List[Dict]:
+        """
+        Analyze multiple texts using Perspective API concurrently
+        
+        Args:
+            texts: List of texts to analyze
+            
+        Returns:
+            List of analysis results, in the same order as texts
+        """
+        if not texts:
+            return []
+        
+        # Calls are network-bound, so overlap them. Each call still waits
+        # for its PERSPECTIVE_QPS slot; the pool only bounds in-flight requests.
+        workers = min(PERSPECTIVE_MAX_CONNECTIONS, len(texts))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.analyze, texts))
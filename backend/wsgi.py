@@ -0,0 +1,6 @@
+"""
+SafeSpeakAI Backend - WSGI Entry Point
+Exposes the Flask app for production servers such as gunicorn
+"""
+
+from app import app